@@ -6,16 +6,35 @@ and fires OpenClaw webhooks on new messages.
 """
 
 import asyncio
+import atexit
+import concurrent.futures
 import json
+import logging
+import logging.handlers
 import os
+import queue
 import signal
 import sys
+import threading
 import time
 from pathlib import Path
-from urllib.request import Request, urlopen
-from urllib.error import URLError
 
 import slixmpp
+import urllib3
+
+try:
+    import orjson
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+except ImportError:  # stdlib fallback, same bytes-in/bytes-out interface
+    def json_dumps(obj):
+        return json.dumps(obj).encode()
+    json_loads = json.loads
+
+try:
+    from watchfiles import Change, awatch
+except ImportError:  # fall back to polling the outbox
+    awatch = None
 
 # Config
 JID = os.environ.get('JMP_JID', '')
@@ -28,40 +47,152 @@ LOG_FILE = Path(os.environ.get('JMP_LOG', os.path.expanduser('~/.openclaw/.jmp-b
 HOOK_URL = os.environ.get('JMP_HOOK_URL', '')  # e.g. http://127.0.0.1:18789/hooks/sms
 HOOK_TOKEN = os.environ.get('JMP_HOOK_TOKEN', '')
 
+# Shared connection pool so hook POSTs reuse keep-alive sockets instead of
+# paying a TCP (+TLS) handshake per SMS. urllib3 discards pooled sockets the
+# peer has already closed before reusing them; retries only cover connection
+# failures, since a POST that reached the server must not be replayed.
+HOOK_POOL = urllib3.PoolManager(
+    num_pools=4,
+    maxsize=10,
+    retries=urllib3.Retry(total=2, backoff_factor=0.1),
+)
+HOOK_TIMEOUT = urllib3.Timeout(connect=2, read=10)
+
+# Dedicated, bounded worker pool for hook POSTs so bursts don't compete with
+# the loop's default executor.
+HOOK_WORKERS = int(os.environ.get('JMP_HOOK_WORKERS', '8'))
+HOOK_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=HOOK_WORKERS,
+    thread_name_prefix='hook',
+)
+HOOK_BATCH = 16  # max queued hooks handed to one executor job
+HOOK_STOP = threading.Event()  # set on shutdown; running batches skip the rest
+OUTBOX_CONCURRENCY = 16  # max outbox files being read/removed at once
+
+# Single writer thread for inbox files: keeps disk I/O off the loop while
+# preserving arrival order of file names and hook dispatch.
+INBOX_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='inbox')
+
 # Ensure dirs exist
 INBOX_DIR.mkdir(parents=True, exist_ok=True)
 OUTBOX_DIR.mkdir(parents=True, exist_ok=True)
+LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+
+# Logging: records are handed to a listener thread so logging never blocks
+# the event loop on disk I/O. The log file rotates at 10 MB, keeping 5 backups.
+LOG_MAX_BYTES = 10_000_000
+LOG_BACKUPS = 5
+
+
+class _LogFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotating handler that keeps every log file at mode 0600."""
 
-def log(msg):
-    ts = time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime())
-    line = f"[{ts}] {msg}"
-    print(line, flush=True)
-    with open(LOG_FILE, 'a') as f:
-        f.write(line + '\n')
+    def _open(self):
+        # Create (or tighten) the file at 0600 before logging opens it, so a
+        # fresh or rolled-over log is never briefly readable by others.
+        fd = os.open(self.baseFilename, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        try:
+            os.fchmod(fd, 0o600)
+        finally:
+            os.close(fd)
+        return super()._open()
 
 
-def fire_hook(phone, body, timestamp):
-    """POST incoming SMS to OpenClaw hook endpoint."""
+class _LogFormatter(logging.Formatter):
+    """Formatter that only re-runs strftime when the second changes."""
+
+    def __init__(self):
+        super().__init__('[%(asctime)s] %(message)s')
+        self._ts_cache = (None, '')
+
+    def formatTime(self, record, datefmt=None):
+        t = int(record.created)
+        cached_t, cached = self._ts_cache
+        if cached_t != t:
+            cached = time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime(t))
+            self._ts_cache = (t, cached)
+        return cached
+
+
+_log_formatter = _LogFormatter()
+_log_handlers = [
+    logging.StreamHandler(sys.stdout),
+    _LogFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding='utf-8'),
+]
+for _h in _log_handlers:
+    _h.setFormatter(_log_formatter)
+
+_log_queue = queue.SimpleQueue()
+LOG_LISTENER = logging.handlers.QueueListener(_log_queue, *_log_handlers)
+LOG_LISTENER.start()
+
+logger = logging.getLogger('jmp_bridge')
+logger.setLevel(logging.INFO)
+logger.propagate = False
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+
+atexit.register(LOG_LISTENER.stop)
+
+
+def write_inbox(stem, payload):
+    """Atomically create a 0600 inbox file for payload, never overwriting.
+
+    Every name carries a zero-padded sequence number so messages sharing a
+    stem still sort in arrival order.
+    """
+    n = 0
+    while True:
+        path = INBOX_DIR / f"{stem}-{n:03d}.json"
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            n += 1
+            continue
+        try:
+            os.write(fd, payload)
+        finally:
+            os.close(fd)
+        return path
+
+
+def scan_outbox():
+    """Return queued outbox .json entries, oldest name first."""
+    with os.scandir(OUTBOX_DIR) as it:
+        return sorted(
+            (e for e in it if e.name.endswith('.json') and e.is_file(follow_symlinks=False)),
+            key=lambda e: e.name,
+        )
+
+
+def read_outbox(path):
+    with open(path, 'rb') as fh:
+        return json_loads(fh.read())
+
+
+def fire_hook(phone, payload):
+    """POST an already-encoded incoming SMS payload to OpenClaw hook endpoint."""
     if not HOOK_URL:
         return
-    payload = json.dumps({
-        'from': phone,
-        'body': body,
-        'timestamp': timestamp,
-    }).encode()
     headers = {
         'Content-Type': 'application/json',
     }
     if HOOK_TOKEN:
         headers['Authorization'] = f'Bearer {HOOK_TOKEN}'
     try:
-        req = Request(HOOK_URL, data=payload, headers=headers, method='POST')
-        resp = urlopen(req, timeout=10)
-        log(f"[HOOK] Fired for {phone} -> {resp.status}")
-    except URLError as e:
-        log(f"[HOOK ERROR] {e}")
+        resp = HOOK_POOL.request('POST', HOOK_URL, body=payload, headers=headers,
+                                 timeout=HOOK_TIMEOUT)
+        logger.info('[HOOK] Fired for %s -> %s', phone, resp.status)
     except Exception as e:
-        log(f"[HOOK ERROR] {e}")
+        logger.warning('[HOOK ERROR] %s', e)
+
+
+def fire_hooks(batch):
+    """Fire a batch of hooks back to back over the pooled connection."""
+    for i, (phone, payload) in enumerate(batch):
+        if HOOK_STOP.is_set():
+            logger.warning('[HOOK] Shutting down, skipped %d queued hook(s)', len(batch) - i)
+            return
+        fire_hook(phone, payload)
 
 
 class JMPBridge(slixmpp.ClientXMPP):
@@ -72,25 +203,34 @@ class JMPBridge(slixmpp.ClientXMPP):
         self.add_event_handler("presence_subscribe", self.on_subscribe)
         self.add_event_handler("disconnected", self.on_disconnect)
         self.running = True
+        self.stop_event = asyncio.Event()
+        self._disconnecting = None
+        self._outbox_task = None
+        self._outbox_lock = asyncio.Lock()
+        self._outbox_sem = asyncio.Semaphore(OUTBOX_CONCURRENCY)
+        self.hook_q = asyncio.Queue()
+        self._hook_slots = asyncio.Semaphore(HOOK_WORKERS)
+        self._hook_task = asyncio.ensure_future(self._hook_worker()) if HOOK_URL else None
 
     async def on_session(self, event):
         await self.get_roster()
         self.send_presence()
         self.send_presence(pto='cheogram.com', ptype='subscribed')
-        log(f"Connected as {self.boundjid.full}")
+        logger.info('Connected as %s', self.boundjid.full)
 
-        # Start outbox watcher
-        asyncio.ensure_future(self.watch_outbox())
+        # Start outbox watcher (session_start fires again on every reconnect)
+        if self._outbox_task is None or self._outbox_task.done():
+            self._outbox_task = asyncio.ensure_future(self.watch_outbox())
 
     def on_subscribe(self, presence):
         self.send_presence(pto=str(presence['from']), ptype='subscribed')
-        log(f"Accepted subscription from {presence['from']}")
+        logger.info('Accepted subscription from %s', presence['from'])
 
-    def on_message(self, msg):
+    async def on_message(self, msg):
         if not msg['body']:
             return
 
-        frm = str(msg['from']).split('/')[0]
+        frm = str(msg['from']).partition('/')[0]
         body = msg['body']
 
         # Skip server welcome messages
@@ -99,34 +239,51 @@ class JMPBridge(slixmpp.ClientXMPP):
 
         # Skip cheogram bot admin messages (not SMS)
         if frm == 'cheogram.com':
-            log(f"[ADMIN] cheogram.com: {body[:100]}")
+            logger.info('[ADMIN] cheogram.com: %s', body[:100])
             return
 
         # This is an incoming SMS!
-        phone = frm.replace('@cheogram.com', '')
+        local, _, domain = frm.partition('@')
+        phone = local if domain == 'cheogram.com' else frm
         ts = int(time.time())
 
-        msg_data = {
+        # Encoded once: the same bytes go to the inbox file and the hook
+        payload = json_dumps({
             'from': phone,
             'body': body,
             'timestamp': ts,
             'jid': frm,
-        }
+        })
 
-        # Write to inbox
-        filename = f"{ts}-{phone.replace('+', '')}.json"
-        inbox_path = INBOX_DIR / filename
-        with open(inbox_path, 'w') as f:
-            json.dump(msg_data, f)
+        # Write to inbox (off the loop so a slow disk can't stall the stream)
+        await self.loop.run_in_executor(
+            INBOX_EXECUTOR, write_inbox, f"{ts}-{phone.replace('+', '')}", payload)
 
-        log(f"[SMS IN] {phone}: {body[:100]}")
+        logger.info('[SMS IN] %s: %s', phone, body[:100])
 
         # Fire OpenClaw hook (non-blocking)
-        asyncio.get_event_loop().run_in_executor(None, fire_hook, phone, body, ts)
+        if self._hook_task is not None:
+            self.hook_q.put_nowait((phone, payload))
+
+    async def _hook_worker(self):
+        """Feed queued hooks to HOOK_EXECUTOR, up to HOOK_WORKERS jobs at once."""
+        while True:
+            batch = [await self.hook_q.get()]
+            await self._hook_slots.acquire()
+            # Only coalesce the backlog once every other worker is busy
+            if self._hook_slots.locked():
+                while len(batch) < HOOK_BATCH and not self.hook_q.empty():
+                    batch.append(self.hook_q.get_nowait())
+            try:
+                fut = self.loop.run_in_executor(HOOK_EXECUTOR, fire_hooks, batch)
+            except RuntimeError:  # executor shut down
+                self._hook_slots.release()
+                return
+            fut.add_done_callback(lambda _fut: self._hook_slots.release())
 
     def on_disconnect(self, event):
         if self.running:
-            log("Disconnected, reconnecting in 5s...")
+            logger.info('Disconnected, reconnecting in 5s...')
             asyncio.ensure_future(self.reconnect_delayed())
 
     async def reconnect_delayed(self):
@@ -136,29 +293,84 @@ class JMPBridge(slixmpp.ClientXMPP):
 
     async def watch_outbox(self):
         """Watch outbox directory for messages to send."""
-        while self.running:
+        # Pick up anything queued while we were offline
+        await self._drain_outbox()
+        if awatch is not None:
             try:
-                for f in sorted(OUTBOX_DIR.iterdir()):
-                    if f.suffix == '.json':
-                        try:
-                            with open(f) as fh:
-                                data = json.load(fh)
-                            to_phone = data['to']
-                            body = data['body']
-                            jid = f"{to_phone}@cheogram.com"
-                            self.send_message(mto=jid, mbody=body, mtype='chat')
-                            log(f"[SMS OUT] {to_phone}: {body[:100]}")
-                            f.unlink()
-                        except Exception as e:
-                            log(f"[ERROR] Failed to send {f.name}: {e}")
-                            f.rename(f.with_suffix('.failed'))
+                # Timeouts yield an empty change set, so files written before
+                # the watch went live (or missed events) are still picked up.
+                async for _changes in awatch(
+                    OUTBOX_DIR,
+                    watch_filter=lambda change, path: change != Change.deleted and path.endswith('.json'),
+                    debounce=200,
+                    rust_timeout=5000,
+                    yield_on_timeout=True,
+                    stop_event=self.stop_event,
+                ):
+                    await self._drain_outbox()
+                return
             except Exception as e:
-                pass
-            await asyncio.sleep(2)
+                logger.error('[ERROR] Outbox watcher failed, falling back to polling: %s', e)
+        while self.running:
+            try:
+                await asyncio.wait_for(self.stop_event.wait(), timeout=2)
+            except asyncio.TimeoutError:
+                await self._drain_outbox()
+
+    async def _drain_outbox(self):
+        """Send and remove every queued .json file in the outbox."""
+        async with self._outbox_lock:
+            try:
+                entries = await asyncio.to_thread(scan_outbox)
+            except OSError:
+                return
+            # File I/O runs concurrently off the loop; sends stay in name order.
+            results = await asyncio.gather(
+                *(self._outbox_io(read_outbox, e.path) for e in entries),
+                return_exceptions=True,
+            )
+            done, cleanups = [], []
+            for entry, data in zip(entries, results):
+                try:
+                    if isinstance(data, BaseException):
+                        raise data
+                    to_phone = data['to']
+                    body = data['body']
+                    jid = f"{to_phone}@cheogram.com"
+                    self.send_message(mto=jid, mbody=body, mtype='chat')
+                    logger.info('[SMS OUT] %s: %s', to_phone, body[:100])
+                    done.append(entry)
+                    cleanups.append(self._outbox_io(os.unlink, entry.path))
+                except Exception as e:
+                    logger.error('[ERROR] Failed to send %s: %s', entry.name, e)
+                    failed = entry.path[:-len('.json')] + '.failed'
+                    done.append(entry)
+                    cleanups.append(self._outbox_io(os.rename, entry.path, failed))
+            results = await asyncio.gather(*cleanups, return_exceptions=True)
+            for entry, result in zip(done, results):
+                if isinstance(result, Exception):
+                    logger.error('[ERROR] Failed to remove %s from outbox: %s', entry.name, result)
+
+    async def _outbox_io(self, func, *args):
+        async with self._outbox_sem:
+            return await asyncio.to_thread(func, *args)
 
     def stop(self):
         self.running = False
-        self.disconnect()
+        self.stop_event.set()
+        self._disconnecting = self.disconnect()
+
+    async def wait_stopped(self):
+        """Wait for stop(), then for the stream to flush queued stanzas and close."""
+        await self.stop_event.wait()
+        if self._disconnecting is not None:
+            await self._disconnecting
+        # Only now can no more messages arrive, so the executors can go
+        HOOK_STOP.set()
+        if self._hook_task is not None:
+            self._hook_task.cancel()
+        HOOK_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+        INBOX_EXECUTOR.shutdown(wait=False)
 
 
 async def main():
@@ -166,26 +378,25 @@ async def main():
         print("ERROR: JMP_PASSWORD not set", file=sys.stderr)
         sys.exit(1)
 
-    log("Starting JMP bridge...")
+    logger.info('Starting JMP bridge...')
     if HOOK_URL:
-        log(f"Hook configured: {HOOK_URL}")
+        logger.info('Hook configured: %s', HOOK_URL)
     else:
-        log("No hook URL configured (file-only mode)")
+        logger.info('No hook URL configured (file-only mode)')
 
     bot = JMPBridge()
 
     # Handle signals
-    loop = asyncio.get_event_loop()
+    loop = asyncio.get_running_loop()
     for sig in (signal.SIGTERM, signal.SIGINT):
         loop.add_signal_handler(sig, bot.stop)
 
     bot.connect()
 
-    # Run forever
-    while bot.running:
-        await asyncio.sleep(1)
+    # Run until a signal stops the bot and the stream has been flushed
+    await bot.wait_stopped()
 
-    log("JMP bridge stopped.")
+    logger.info('JMP bridge stopped.')
 
 
 if __name__ == '__main__':